@@ -4,22 +4,173 @@ Layout completo com QR Code para validação da chave de acesso.
 """
 
 from pathlib import Path
-from lxml import etree
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm, mm
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from reportlab.pdfgen import canvas
+from xml.etree import ElementTree as ET
 from datetime import datetime
-import qrcode
+from functools import lru_cache
 from io import BytesIO
 
 
+NS_NFSE = 'http://www.sped.fazenda.gov.br/nfse'
+
+
+@lru_cache(maxsize=None)
+def _estilos() -> dict:
+    """
+    Monta os estilos e layouts das tabelas do DANFSE.
+    
+    São idênticos em todo DANFSE: montados uma única vez, na primeira
+    geração de PDF, para que importar o módulo não carregue o ReportLab.
+    
+    Returns:
+        Dicionário com os ParagraphStyle, TableStyle e larguras de colunas
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import TableStyle
+    
+    styles = getSampleStyleSheet()
+    
+    titulo = ParagraphStyle(
+        'Titulo',
+        parent=styles['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#000080'),
+        alignment=TA_CENTER,
+        spaceAfter=6
+    )
+    
+    subtitulo = ParagraphStyle(
+        'Subtitulo',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.grey,
+        alignment=TA_CENTER,
+        spaceAfter=12
+    )
+    
+    secao = ParagraphStyle(
+        'Secao',
+        parent=styles['Heading2'],
+        fontSize=12,
+        textColor=colors.HexColor('#000080'),
+        spaceAfter=6,
+        spaceBefore=10
+    )
+    
+    chave = ParagraphStyle(
+        'Chave',
+        parent=styles['Normal'],
+        fontSize=9,
+        fontName='Courier',
+        textColor=colors.HexColor('#000080'),
+        alignment=TA_CENTER,
+        spaceAfter=6
+    )
+    
+    # Tabelas rótulo/valor (dados da NFS-e, prestador, tomador e serviço)
+    ts_dados = TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8E8E8')),
+        ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
+        ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 8),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+    
+    ts_qr = TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+    
+    ts_principal = TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ])
+    
+    ts_valores = TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8E8E8')),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#D0D0D0')),
+        ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
+        ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 8),
+        ('FONT', (0, -1), (-1, -1), 'Helvetica-Bold', 10),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+    
+    col_nfse = (3.5*cm, 6.5*cm)
+    col_qr = (6*cm,)
+    col_principal = (10*cm, 6.5*cm)
+    col_dados = (3.5*cm, 13.5*cm)
+    
+    return {
+        'titulo': titulo,
+        'subtitulo': subtitulo,
+        'secao': secao,
+        'chave': chave,
+        'ts_dados': ts_dados,
+        'ts_qr': ts_qr,
+        'ts_principal': ts_principal,
+        'ts_valores': ts_valores,
+        'col_nfse': col_nfse,
+        'col_qr': col_qr,
+        'col_principal': col_principal,
+        'col_dados': col_dados,
+    }
+
+
+def _tag(nome: str) -> str:
+    """Retorna a tag qualificada ({namespace}nome) de um elemento da NFS-e."""
+    return f'{{{NS_NFSE}}}{nome}'
+
+
 class GeradorDANFSE:
     """Gerador de DANFSE em PDF."""
     
+    # Elementos que abrem cada seção do documento
+    SECOES = {
+        _tag('emit'): 'prestador',
+        _tag('toma'): 'tomador',
+        _tag('serv'): 'servico',
+        _tag('valores'): 'valores',
+    }
+    
+    # Campos coletados em cada seção (tag -> chave)
+    CAMPOS = {
+        'nfse': {
+            _tag('nNFSe'): 'numero',
+            _tag('cStat'): 'status',
+            _tag('dhProc'): 'dh_processamento',
+            _tag('xLocEmi'): 'local_emissao',
+            _tag('xLocPrestacao'): 'local_prestacao',
+        },
+        'prestador': {
+            _tag('CNPJ'): 'cnpj',
+            _tag('xNome'): 'nome',
+            _tag('xLgr'): 'logradouro',
+            _tag('nro'): 'numero',
+            _tag('xBairro'): 'bairro',
+            _tag('UF'): 'uf',
+            _tag('CEP'): 'cep',
+            _tag('fone'): 'fone',
+            _tag('email'): 'email',
+        },
+        'tomador': {
+            _tag('CPF'): 'cpf',
+            _tag('CNPJ'): 'cnpj',
+            _tag('xNome'): 'nome',
+        },
+        'servico': {
+            _tag('cTribNac'): 'codigo',
+            _tag('xDescServ'): 'descricao',
+        },
+        'valores': {
+            _tag('vBC'): 'base_calculo',
+            _tag('pAliqAplic'): 'aliquota',
+            _tag('vISSQN'): 'iss',
+            _tag('vLiq'): 'liquido',
+        },
+    }
+    
     def __init__(self, xml_path: str):
         """
         Inicializa gerador.
@@ -28,11 +179,10 @@ class GeradorDANFSE:
             xml_path: Caminho do XML da NFS-e autorizada
         """
         self.xml_path = Path(xml_path)
-        self.ns = {'nfse': 'http://www.sped.fazenda.gov.br/nfse'}
         
-        # Carregar e parsear XML
-        xml_content = self.xml_path.read_text(encoding='utf-8')
-        self.root = etree.fromstring(xml_content.encode('utf-8'))
+        # Carregar e parsear XML direto do arquivo (sem cópia intermediária em str)
+        self.tree = ET.parse(self.xml_path)
+        self.root = self.tree.getroot()
         
         # Extrair dados
         self._extrair_dados()
@@ -40,77 +190,104 @@ class GeradorDANFSE:
     def _extrair_dados(self):
         """Extrai dados do XML."""
         
-        inf_nfse = self.root.find('.//nfse:infNFSe', self.ns)
+        inf_nfse = self.root.find(f'.//{_tag("infNFSe")}')
+        
+        # Percorre a árvore uma única vez coletando os campos de cada seção
+        coletado = {'nfse': {}}
+        self._percorrer(inf_nfse, 'nfse', coletado)
+        nfse = coletado['nfse']
         
         # Chave e número
         id_nfse = inf_nfse.get('Id', '')
-        self.chave_acesso = id_nfse.replace('NFS', '') if id_nfse.startswith('NFS') else id_nfse
-        self.numero_nfse = inf_nfse.findtext('.//nfse:nNFSe', namespaces=self.ns, default='')
+        self.chave_acesso = id_nfse[3:] if id_nfse[:3] == 'NFS' else id_nfse
+        self.numero_nfse = nfse.get('numero', '')
         
         # Status e processamento
-        self.status = inf_nfse.findtext('.//nfse:cStat', namespaces=self.ns, default='')
-        self.dh_processamento = inf_nfse.findtext('.//nfse:dhProc', namespaces=self.ns, default='')
+        self.status = nfse.get('status', '')
+        self.dh_processamento = nfse.get('dh_processamento', '')
+        self.dh_processamento_display = self.dh_processamento[:19]
         
         # Locais
-        self.local_emissao = inf_nfse.findtext('.//nfse:xLocEmi', namespaces=self.ns, default='')
-        self.local_prestacao = inf_nfse.findtext('.//nfse:xLocPrestacao', namespaces=self.ns, default='')
+        self.local_emissao = nfse.get('local_emissao', '')
+        self.local_prestacao = nfse.get('local_prestacao', '')
         
         # Prestador (Emitente)
-        emit = inf_nfse.find('.//nfse:emit', self.ns)
+        emit = coletado.get('prestador', {})
         self.prestador = {
-            'cnpj': emit.findtext('.//nfse:CNPJ', namespaces=self.ns, default=''),
-            'nome': emit.findtext('.//nfse:xNome', namespaces=self.ns, default=''),
-            'logradouro': emit.findtext('.//nfse:xLgr', namespaces=self.ns, default=''),
-            'numero': emit.findtext('.//nfse:nro', namespaces=self.ns, default=''),
-            'bairro': emit.findtext('.//nfse:xBairro', namespaces=self.ns, default=''),
-            'uf': emit.findtext('.//nfse:UF', namespaces=self.ns, default=''),
-            'cep': emit.findtext('.//nfse:CEP', namespaces=self.ns, default=''),
-            'fone': emit.findtext('.//nfse:fone', namespaces=self.ns, default=''),
-            'email': emit.findtext('.//nfse:email', namespaces=self.ns, default=''),
+            chave: emit.get(chave, '')
+            for chave in ('cnpj', 'nome', 'logradouro', 'numero', 'bairro', 'uf', 'cep', 'fone', 'email')
         }
         
         # Tomador (do DPS)
-        dps = self.root.find('.//nfse:DPS', self.ns)
-        toma = dps.find('.//nfse:toma', self.ns) if dps is not None else None
+        toma = coletado.get('tomador')
         
         if toma is not None:
-            cpf = toma.findtext('.//nfse:CPF', namespaces=self.ns, default='')
-            cnpj = toma.findtext('.//nfse:CNPJ', namespaces=self.ns, default='')
+            cpf = toma.get('cpf', '')
+            cnpj = toma.get('cnpj', '')
             
             self.tomador = {
                 'documento': cpf if cpf else cnpj,
                 'tipo_doc': 'CPF' if cpf else 'CNPJ',
-                'nome': toma.findtext('.//nfse:xNome', namespaces=self.ns, default=''),
+                'nome': toma.get('nome', ''),
             }
         else:
             self.tomador = {'documento': '', 'tipo_doc': '', 'nome': ''}
         
         # Serviço
-        serv = dps.find('.//nfse:serv', self.ns) if dps is not None else None
-        if serv is not None:
-            self.servico = {
-                'codigo': serv.findtext('.//nfse:cTribNac', namespaces=self.ns, default=''),
-                'descricao': serv.findtext('.//nfse:xDescServ', namespaces=self.ns, default=''),
-            }
-        else:
-            self.servico = {'codigo': '', 'descricao': ''}
+        serv = coletado.get('servico', {})
+        self.servico = {
+            'codigo': serv.get('codigo', ''),
+            'descricao': serv.get('descricao', ''),
+        }
         
         # Valores
-        valores = inf_nfse.find('.//nfse:valores', self.ns)
+        valores = coletado.get('valores', {})
         self.valores = {
-            'base_calculo': valores.findtext('.//nfse:vBC', namespaces=self.ns, default='0.00'),
-            'aliquota': valores.findtext('.//nfse:pAliqAplic', namespaces=self.ns, default='0.00'),
-            'iss': valores.findtext('.//nfse:vISSQN', namespaces=self.ns, default='0.00'),
-            'liquido': valores.findtext('.//nfse:vLiq', namespaces=self.ns, default='0.00'),
+            chave: valores.get(chave, '0.00')
+            for chave in ('base_calculo', 'aliquota', 'iss', 'liquido')
         }
     
-    def _gerar_qrcode(self) -> Image:
+    def _percorrer(self, elemento, secao: str, coletado: dict):
+        """
+        Percorre os descendentes de um elemento coletando os campos da seção.
+        
+        Apenas a primeira ocorrência de cada seção e de cada campo é
+        considerada, como no find/findtext com './/'.
+        
+        Args:
+            elemento: Elemento a percorrer
+            secao: Seção à qual os campos encontrados pertencem
+            coletado: Dicionário seção -> {chave: texto} preenchido in-place
+        """
+        campos = self.CAMPOS[secao]
+        dados = coletado[secao]
+        
+        for filho in elemento:
+            nova_secao = self.SECOES.get(filho.tag)
+            if nova_secao is not None:
+                if nova_secao not in coletado:
+                    coletado[nova_secao] = {}
+                    self._percorrer(filho, nova_secao, coletado)
+                continue
+            
+            chave = campos.get(filho.tag)
+            if chave is not None and chave not in dados:
+                dados[chave] = filho.text or ''
+            
+            if len(filho):
+                self._percorrer(filho, secao, coletado)
+    
+    def _gerar_qrcode(self):
         """
         Gera QR Code com a chave de acesso da NFS-e.
         
         Returns:
             Imagem do QR Code para o ReportLab
         """
+        import qrcode
+        from reportlab.lib.units import cm
+        from reportlab.platypus import Image
+        
         # Criar QR Code
         qr = qrcode.QRCode(
             version=1,
@@ -145,6 +322,12 @@ class GeradorDANFSE:
             output_path: Caminho para salvar o PDF
         """
         
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import cm
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+        
+        est = _estilos()
+        
         # Criar documento
         doc = SimpleDocTemplate(
             output_path,
@@ -155,58 +338,21 @@ class GeradorDANFSE:
             bottomMargin=1.5*cm
         )
         
-        # Estilos
-        styles = getSampleStyleSheet()
-        
-        titulo_style = ParagraphStyle(
-            'Titulo',
-            parent=styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#000080'),
-            alignment=TA_CENTER,
-            spaceAfter=6
-        )
-        
-        subtitulo_style = ParagraphStyle(
-            'Subtitulo',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.grey,
-            alignment=TA_CENTER,
-            spaceAfter=12
-        )
-        
-        secao_style = ParagraphStyle(
-            'Secao',
-            parent=styles['Heading2'],
-            fontSize=12,
-            textColor=colors.HexColor('#000080'),
-            spaceAfter=6,
-            spaceBefore=10
-        )
-        
-        normal_style = ParagraphStyle(
-            'Normal',
-            parent=styles['Normal'],
-            fontSize=9,
-            leading=11
-        )
-        
         # Elementos do documento
         elementos = []
         
         # CABEÇALHO
-        elementos.append(Paragraph("NOTA FISCAL DE SERVIÇOS ELETRÔNICA", titulo_style))
-        elementos.append(Paragraph("NFS-e (DANFSE - Documento Auxiliar)", subtitulo_style))
+        elementos.append(Paragraph("NOTA FISCAL DE SERVIÇOS ELETRÔNICA", est['titulo']))
+        elementos.append(Paragraph("NFS-e (DANFSE - Documento Auxiliar)", est['subtitulo']))
         
         # Status
         status_text = "AUTORIZADA" if self.status == "100" else f"STATUS: {self.status}"
-        elementos.append(Paragraph(f"<b>{status_text}</b>", subtitulo_style))
+        elementos.append(Paragraph(f"<b>{status_text}</b>", est['subtitulo']))
         
         elementos.append(Spacer(1, 0.3*cm))
         
         # DADOS DA NFS-e com QR CODE
-        elementos.append(Paragraph("DADOS DA NFS-e", secao_style))
+        elementos.append(Paragraph("DADOS DA NFS-e", est['secao']))
         
         # Criar tabela com QR Code
         qr_img = self._gerar_qrcode()
@@ -214,54 +360,34 @@ class GeradorDANFSE:
         # Tabela principal com dados e QR Code
         dados_nfse_esq = [
             ['Número NFS-e:', self.numero_nfse],
-            ['Data/Hora:', self.dh_processamento[:19] if self.dh_processamento else ''],
+            ['Data/Hora:', self.dh_processamento_display],
             ['Local Emissão:', self.local_emissao],
             ['Local Prestação:', self.local_prestacao],
         ]
         
-        tabela_esq = Table(dados_nfse_esq, colWidths=[3.5*cm, 6.5*cm])
-        tabela_esq.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8E8E8')),
-            ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
-            ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 8),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        tabela_esq = Table(dados_nfse_esq, colWidths=est['col_nfse'])
+        tabela_esq.setStyle(est['ts_dados'])
         
         # Tabela QR Code à direita
-        qr_legenda = Paragraph("<font size=7><b>Consulte a NFS-e:</b><br/>Aponte a câmera<br/>para o QR Code</font>", subtitulo_style)
+        qr_legenda = Paragraph("<font size=7><b>Consulte a NFS-e:</b><br/>Aponte a câmera<br/>para o QR Code</font>", est['subtitulo'])
         dados_qr = [[qr_img], [qr_legenda]]
-        tabela_qr = Table(dados_qr, colWidths=[6*cm])
-        tabela_qr.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        tabela_qr = Table(dados_qr, colWidths=est['col_qr'])
+        tabela_qr.setStyle(est['ts_qr'])
         
         # Combinar tabelas lado a lado
-        tabela_principal = Table([[tabela_esq, tabela_qr]], colWidths=[10*cm, 6.5*cm])
-        tabela_principal.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        tabela_principal = Table([[tabela_esq, tabela_qr]], colWidths=est['col_principal'])
+        tabela_principal.setStyle(est['ts_principal'])
         elementos.append(tabela_principal)
         
         elementos.append(Spacer(1, 0.3*cm))
         
         # CHAVE DE ACESSO (em destaque)
-        chave_style = ParagraphStyle(
-            'Chave',
-            parent=styles['Normal'],
-            fontSize=9,
-            fontName='Courier',
-            textColor=colors.HexColor('#000080'),
-            alignment=TA_CENTER,
-            spaceAfter=6
-        )
-        elementos.append(Paragraph(f"<b>CHAVE DE ACESSO:</b><br/>{self.chave_acesso}", chave_style))
+        elementos.append(Paragraph(f"<b>CHAVE DE ACESSO:</b><br/>{self.chave_acesso}", est['chave']))
         
         elementos.append(Spacer(1, 0.5*cm))
         
         # PRESTADOR
-        elementos.append(Paragraph("PRESTADOR DE SERVIÇOS (EMITENTE)", secao_style))
+        elementos.append(Paragraph("PRESTADOR DE SERVIÇOS (EMITENTE)", est['secao']))
         
         prestador_dados = [
             ['CNPJ:', self.prestador['cnpj']],
@@ -275,60 +401,42 @@ class GeradorDANFSE:
         if self.prestador['email']:
             prestador_dados.append(['E-mail:', self.prestador['email']])
         
-        tabela_prestador = Table(prestador_dados, colWidths=[3.5*cm, 13.5*cm])
-        tabela_prestador.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8E8E8')),
-            ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
-            ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 8),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        tabela_prestador = Table(prestador_dados, colWidths=est['col_dados'])
+        tabela_prestador.setStyle(est['ts_dados'])
         elementos.append(tabela_prestador)
         
         elementos.append(Spacer(1, 0.5*cm))
         
         # TOMADOR
-        elementos.append(Paragraph("TOMADOR DE SERVIÇOS (CLIENTE)", secao_style))
+        elementos.append(Paragraph("TOMADOR DE SERVIÇOS (CLIENTE)", est['secao']))
         
         tomador_dados = [
             [f"{self.tomador['tipo_doc']}:", self.tomador['documento']],
             ['Nome:', self.tomador['nome']],
         ]
         
-        tabela_tomador = Table(tomador_dados, colWidths=[3.5*cm, 13.5*cm])
-        tabela_tomador.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8E8E8')),
-            ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
-            ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 8),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        tabela_tomador = Table(tomador_dados, colWidths=est['col_dados'])
+        tabela_tomador.setStyle(est['ts_dados'])
         elementos.append(tabela_tomador)
         
         elementos.append(Spacer(1, 0.5*cm))
         
         # SERVIÇO
-        elementos.append(Paragraph("DESCRIÇÃO DO SERVIÇO", secao_style))
+        elementos.append(Paragraph("DESCRIÇÃO DO SERVIÇO", est['secao']))
         
         servico_dados = [
             ['Código:', self.servico['codigo']],
             ['Descrição:', self.servico['descricao']],
         ]
         
-        tabela_servico = Table(servico_dados, colWidths=[3.5*cm, 13.5*cm])
-        tabela_servico.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8E8E8')),
-            ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
-            ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 8),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        tabela_servico = Table(servico_dados, colWidths=est['col_dados'])
+        tabela_servico.setStyle(est['ts_dados'])
         elementos.append(tabela_servico)
         
         elementos.append(Spacer(1, 0.5*cm))
         
         # VALORES
-        elementos.append(Paragraph("VALORES", secao_style))
+        elementos.append(Paragraph("VALORES", est['secao']))
         
         valores_dados = [
             ['Base de Cálculo:', f"R$ {self.valores['base_calculo']}"],
@@ -337,16 +445,8 @@ class GeradorDANFSE:
             ['Valor Líquido:', f"R$ {self.valores['liquido']}"],
         ]
         
-        tabela_valores = Table(valores_dados, colWidths=[3.5*cm, 13.5*cm])
-        tabela_valores.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8E8E8')),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#D0D0D0')),
-            ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
-            ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 8),
-            ('FONT', (0, -1), (-1, -1), 'Helvetica-Bold', 10),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        tabela_valores = Table(valores_dados, colWidths=est['col_dados'])
+        tabela_valores.setStyle(est['ts_valores'])
         elementos.append(tabela_valores)
         
         elementos.append(Spacer(1, 1*cm))
@@ -355,7 +455,7 @@ class GeradorDANFSE:
         rodape = Paragraph(
             "<i>Este documento é uma representação gráfica simplificada da NFS-e autorizada pela Secretaria de Finanças.</i><br/>"
             f"<i>Documento gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</i>",
-            subtitulo_style
+            est['subtitulo']
         )
         elementos.append(rodape)
         
@@ -403,6 +503,69 @@ def gerar_danfse(xml_path: str, output_path: str = None) -> str:
     return str(output_path)
 
 
+def gerar_danfse_batch(xml_paths: list[str], out_dir: str = None, workers: int = None) -> list[dict]:
+    """
+    Gera DANFSEs em paralelo para vários XMLs, um processo por núcleo.
+    
+    Cada DANFSE é independente e a montagem do PDF no ReportLab é CPU-bound
+    (segura o GIL), por isso usa processos em vez de threads. Falha em um
+    XML não interrompe os demais: o resultado de cada arquivo é reportado.
+    
+    Args:
+        xml_paths: Caminhos dos XMLs das NFS-e autorizadas
+        out_dir: Diretório de saída dos PDFs (opcional, padrão igual a gerar_danfse)
+        workers: Número de processos (opcional, padrão os.cpu_count())
+    
+    Returns:
+        Lista na mesma ordem dos XMLs, com {'xml', 'pdf', 'erro'} por arquivo
+        ('pdf' None e 'erro' preenchido quando a geração falha)
+    
+    Raises:
+        ValueError: Se, com out_dir, XMLs diferentes gerariam o mesmo PDF
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    
+    if not xml_paths:
+        return []
+    
+    # Não sobe mais processos do que XMLs
+    workers = min(workers or os.cpu_count() or 1, len(xml_paths))
+    
+    if out_dir is not None:
+        pdf_dir = Path(out_dir)
+        output_paths = [str(pdf_dir / Path(xml).with_suffix('.pdf').name) for xml in xml_paths]
+        
+        # XMLs de diretórios diferentes com o mesmo nome sobrescreveriam o mesmo PDF
+        origens = {}
+        for xml, pdf in zip(xml_paths, output_paths):
+            origens.setdefault(pdf, []).append(xml)
+        conflitos = {pdf: xmls for pdf, xmls in origens.items() if len(xmls) > 1}
+        if conflitos:
+            detalhes = "; ".join(f"{pdf} <- {', '.join(xmls)}" for pdf, xmls in conflitos.items())
+            raise ValueError(f"XMLs com o mesmo nome gerariam o mesmo PDF em {out_dir}: {detalhes}")
+        
+        pdf_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        output_paths = [None] * len(xml_paths)
+    
+    resultados = []
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(gerar_danfse, xml, pdf)
+            for xml, pdf in zip(xml_paths, output_paths)
+        ]
+        
+        for xml, future in zip(xml_paths, futures):
+            try:
+                resultados.append({'xml': xml, 'pdf': future.result(), 'erro': None})
+            except Exception as e:
+                resultados.append({'xml': xml, 'pdf': None, 'erro': str(e)})
+    
+    return resultados
+
+
 if __name__ == "__main__":
     import sys
     
@@ -419,10 +582,51 @@ if __name__ == "__main__":
     
     xml_file = Path(xml_path)
     
+    # Diretório ou glob: geração em lote
+    # (um arquivo existente, mesmo com '[' ou '*' no nome, segue o fluxo de arquivo único)
+    if not xml_file.is_file() and (xml_file.is_dir() or any(c in xml_path for c in '*?[')):
+        import glob
+        
+        if xml_file.is_dir():
+            xml_paths = sorted(str(p) for p in xml_file.glob('*.xml'))
+        else:
+            xml_paths = sorted(glob.glob(xml_path))
+        
+        if not xml_paths:
+            print(f"\n[ERRO] Nenhum XML encontrado em: {xml_path}")
+            sys.exit(1)
+        
+        try:
+            print(f"\n[1] Gerando {len(xml_paths)} DANFSEs em paralelo...")
+            
+            resultados = gerar_danfse_batch(xml_paths)
+            
+        except Exception as e:
+            print(f"\n[ERRO] Falha ao gerar DANFSEs: {e}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+        
+        falhas = [r for r in resultados if r['erro']]
+        
+        print(f"[2] {len(resultados) - len(falhas)} de {len(resultados)} DANFSEs gerados com sucesso!")
+        for r in resultados:
+            if r['erro']:
+                print(f"   [ERRO] {r['xml']}: {r['erro']}")
+            else:
+                print(f"   - {r['pdf']}")
+        
+        print("\n" + "="*70)
+        print("SUCESSO!" if not falhas else f"CONCLUÍDO COM {len(falhas)} FALHA(S)")
+        print("="*70 + "\n")
+        
+        sys.exit(1 if falhas else 0)
+    
     if not xml_file.exists():
         print(f"\n[ERRO] Arquivo não encontrado: {xml_path}")
-        print("\nUso: py gerar_danfse_v2.py [caminho_xml]")
+        print("\nUso: py gerar_danfse_v2.py [caminho_xml | diretorio | glob]")
         print("Exemplo: py gerar_danfse_v2.py nfse_autorizada_final.xml")
+        print("Exemplo: py gerar_danfse_v2.py \"outputs/xml/*.xml\"")
         sys.exit(1)
     
     try:
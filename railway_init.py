@@ -3,10 +3,44 @@ Script de inicialização para Railway.
 Carrega certificados de variáveis de ambiente Base64.
 """
 import os
-import base64
+import binascii
 from pathlib import Path
 
 
+def _gravar_pem_base64(data_b64: str, destino: Path, prefixo: bytes, erro: str, rotulo: str) -> int:
+    """
+    Decodifica o Base64 em memória, valida o cabeçalho PEM e grava o arquivo.
+    
+    Caracteres fora do alfabeto Base64 (quebras de linha, aspas em volta do
+    valor da variável) são ignorados, como no base64.b64decode. Se a gravação
+    falhar, o arquivo parcial é removido.
+    
+    Args:
+        data_b64: Conteúdo em Base64
+        destino: Arquivo de saída
+        prefixo: Início esperado do conteúdo decodificado (validação PEM)
+        erro: Mensagem do ValueError se o prefixo não confere
+        rotulo: Rótulo do diagnóstico de tamanho decodificado
+    
+    Returns:
+        Quantidade de bytes gravados
+    """
+    content = binascii.a2b_base64(data_b64)
+    print(f"   {rotulo}: {len(content)} bytes")
+    
+    if not content.startswith(prefixo):
+        raise ValueError(erro)
+    
+    try:
+        destino.write_bytes(content)
+    except Exception:
+        # Não deixa arquivo parcial (seria tratado como certificado existente)
+        destino.unlink(missing_ok=True)
+        raise
+    
+    return len(content)
+
+
 def setup_certificates():
     """
     Configura certificados a partir de variáveis de ambiente Base64.
@@ -40,31 +74,32 @@ def setup_certificates():
             
             # Decodificar cert.pem
             try:
-                cert_content = base64.b64decode(cert_b64)
-                print(f"   Cert decodificado: {len(cert_content)} bytes")
-                
-                # Validar que é um certificado PEM válido
-                if not cert_content.startswith(b'-----BEGIN CERTIFICATE-----'):
-                    raise ValueError("Conteúdo decodificado não é um certificado PEM válido")
-                
-                cert_path.write_bytes(cert_content)
-                print(f"✅ Certificado salvo: {cert_path} ({len(cert_content)} bytes)")
+                # Valida que é um certificado PEM válido antes de gravar
+                cert_size = _gravar_pem_base64(
+                    cert_b64,
+                    cert_path,
+                    b'-----BEGIN CERTIFICATE-----',
+                    "Conteúdo decodificado não é um certificado PEM válido",
+                    "Cert decodificado"
+                )
+                print(f"✅ Certificado salvo: {cert_path} ({cert_size} bytes)")
             except Exception as e:
                 print(f"❌ Erro ao processar CERTIFICATE_CERT_PEM: {e}")
                 raise
             
             # Decodificar key.pem  
             try:
-                key_content = base64.b64decode(key_b64)
-                print(f"   Key decodificada: {len(key_content)} bytes")
-                
-                # Validar que é uma chave privada PEM válida
-                if not key_content.startswith(b'-----BEGIN'):
-                    raise ValueError("Conteúdo decodificado não é uma chave PEM válida")
-                
-                key_path.write_bytes(key_content)
-                os.chmod(key_path, 0o600)  # Permissões restritas
-                print(f"✅ Chave privada salva: {key_path} ({len(key_content)} bytes)")
+                # Valida que é uma chave privada PEM válida antes de gravar
+                key_size = _gravar_pem_base64(
+                    key_b64,
+                    key_path,
+                    b'-----BEGIN',
+                    "Conteúdo decodificado não é uma chave PEM válida",
+                    "Key decodificada"
+                )
+                if os.name != 'nt':
+                    os.chmod(key_path, 0o600)  # Permissões restritas (sem efeito no Windows)
+                print(f"✅ Chave privada salva: {key_path} ({key_size} bytes)")
             except Exception as e:
                 print(f"❌ Erro ao processar CERTIFICATE_KEY_PEM: {e}")
                 raise
@@ -121,7 +156,7 @@ def main():
         try:
             from src.utils.certificate import get_certificate_manager
             cert_mgr = get_certificate_manager()
-            if cert_mgr._certificate is not None:
+            if cert_mgr.is_loaded():
                 print("✅ Certificate Manager carregado com sucesso")
                 print(f"   Titular: {cert_mgr.get_subject_name()}")
             else:
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 """Railway startup script - replaces bash to avoid CRLF issues."""
 import os
-import subprocess
 import sys
+import traceback
 
 print("🚀 Iniciando NFS-e Automation System...")
 
@@ -13,13 +13,20 @@ print(f"PORT={port}")
 # Run certificate initialization
 print("📜 Inicializando certificados...")
 print("="*60)
-result = subprocess.run([sys.executable, "railway_init.py"])
-print("="*60)
-print(f"✅ Inicialização de certificados concluída (exit code: {result.returncode})")
+try:
+    from railway_init import main as railway_init_main
+    railway_init_main()
+    print("="*60)
+    print("✅ Inicialização de certificados concluída")
+except Exception as e:
+    traceback.print_exc()
+    print("="*60)
+    print(f"❌ Falha na inicialização de certificados: {e}")
 print()
 
 # Start Streamlit
 print(f"🌐 Iniciando Streamlit na porta {port}...")
+sys.stdout.flush()  # execvp substitui o processo e descartaria o buffer pendente
 os.execvp(
     sys.executable,
     [
@@ -1,6 +1,10 @@
 """
 Gerenciamento de Certificado Digital A1 para assinatura de NFS-e.
 """
+import os
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 from cryptography.hazmat.primitives import serialization
@@ -13,39 +17,130 @@ from config.settings import settings
 from src.utils.logger import app_logger
 
 
+class _LoadedCertificate:
+    """
+    Certificado e chave carregados juntos, com os caches derivados deles.
+    
+    Substituído por inteiro a cada (re)carregamento, para que uma thread
+    nunca combine o certificado novo com a chave antiga.
+    """
+    
+    def __init__(self, certificate: Optional[x509.Certificate] = None, private_key=None):
+        self.certificate = certificate
+        self.private_key = private_key
+        
+        # Cache dos PEMs serializados e dos arquivos temporários
+        self.cert_pem: Optional[str] = None
+        self.key_pem: Optional[str] = None
+        self.pem_files: Optional[Tuple[str, str]] = None
+        
+        # Validade do certificado em epoch (is_valid sem alocar datetimes)
+        if certificate is not None:
+            self.not_before_ts = certificate.not_valid_before.replace(tzinfo=timezone.utc).timestamp()
+            self.not_after_ts = certificate.not_valid_after.replace(tzinfo=timezone.utc).timestamp()
+        else:
+            self.not_before_ts = None
+            self.not_after_ts = None
+
+
 class CertificateManager:
     """Gerencia certificado digital A1 para assinatura de documentos."""
     
-    def __init__(self, cert_path: Optional[str] = None, password: Optional[str] = None):
+    def __init__(self, cert_path: Optional[str] = None, password: Optional[str] = None, eager: bool = False):
         """
         Inicializa o gerenciador de certificados.
         
+        O certificado só é carregado (decriptado) no primeiro uso, e
+        recarregado quando o mtime dos arquivos muda.
+        
         Args:
             cert_path: Caminho para o arquivo .pfx/.p12 ou .pem
             password: Senha do certificado (apenas para PFX/P12)
+            eager: Carrega o certificado já na inicialização
         """
         self.cert_path = Path(cert_path or settings.CERTIFICATE_PATH)
         self.password = password or settings.CERTIFICATE_PASSWORD
-        self._certificate: Optional[x509.Certificate] = None
-        self._private_key = None
+        self._loaded = _LoadedCertificate()
+        
+        # Serializa carregamentos e criação de arquivos (Streamlit usa várias threads)
+        self._lock = threading.Lock()
         
-        # Tenta carregar certificado
-        self._load_certificate()
+        # mtime dos arquivos no último carregamento (None = ainda não carregado)
+        self._mtime: Optional[tuple] = None
+        
+        if eager:
+            self._load_certificate()
     
-    def _load_certificate(self) -> None:
-        """Carrega o certificado digital do arquivo (PFX/P12 ou PEM)."""
-        try:
-            # Tenta carregar arquivos PEM separados (cert.pem + key.pem)
-            if self._try_load_pem_files():
+    @property
+    def _certificate(self) -> Optional[x509.Certificate]:
+        return self._loaded.certificate
+    
+    @property
+    def _private_key(self):
+        return self._loaded.private_key
+    
+    def _load_certificate(self, force: bool = True) -> None:
+        """
+        Carrega o certificado digital do arquivo (PFX/P12 ou PEM).
+        
+        Args:
+            force: Se False, não recarrega quando outra thread já carregou
+                   os arquivos no mtime atual
+        """
+        with self._lock:
+            mtime = self._source_mtime()
+            if not force and self._mtime is not None and self._mtime == mtime:
                 return
             
-            # Tenta carregar arquivo PFX/P12
-            if self.cert_path.exists():
-                self._try_load_pfx_file()
-        except Exception as e:
-            # Não falha na inicialização - apenas loga o erro
-            app_logger.warning(f"⚠️ Certificado não carregado: {e}")
-            app_logger.info("   O certificado pode ser carregado posteriormente via reload()")
+            loaded = None
+            try:
+                # Tenta carregar arquivos PEM separados (cert.pem + key.pem)
+                loaded = self._try_load_pem_files()
+                
+                # Tenta carregar arquivo PFX/P12
+                if loaded is None and self.cert_path.exists():
+                    loaded = self._try_load_pfx_file()
+            except Exception as e:
+                # Não falha na inicialização - apenas loga o erro
+                app_logger.warning(f"⚠️ Certificado não carregado: {e}")
+                app_logger.info("   O certificado pode ser carregado posteriormente via reload()")
+            
+            # Troca certificado, chave e caches de uma só vez; se a carga
+            # falhar, mantém o certificado anterior (se houver)
+            if loaded is not None:
+                self._loaded = loaded
+            self._mtime = mtime
+    
+    def _source_mtime(self) -> tuple:
+        """Retorna o mtime dos arquivos de certificado existentes (PEM e PFX/P12)."""
+        cert_dir = self.cert_path.parent
+        mtimes = []
+        for path in (cert_dir / "cert.pem", cert_dir / "key.pem", self.cert_path):
+            try:
+                mtimes.append(path.stat().st_mtime)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+    
+    def _current(self) -> _LoadedCertificate:
+        """
+        Carrega o certificado no primeiro uso ou se os arquivos mudaram.
+        
+        Returns:
+            Certificado carregado atual (usar sempre o mesmo objeto na chamada)
+        """
+        if self._mtime is None or self._mtime != self._source_mtime():
+            self._load_certificate(force=False)
+        return self._loaded
+    
+    def is_loaded(self) -> bool:
+        """
+        Verifica se o certificado foi carregado.
+        
+        Returns:
+            True se o certificado está carregado, False caso contrário
+        """
+        return self._current().certificate is not None
     
     def reload(self) -> bool:
         """
@@ -61,7 +156,13 @@ class CertificateManager:
             app_logger.error(f"❌ Erro ao recarregar certificado: {e}")
             return False
     
-    def _try_load_pem_files(self) -> bool:
+    @staticmethod
+    def _common_name(certificate: x509.Certificate) -> str:
+        """Retorna o CN do titular do certificado."""
+        cn = certificate.subject.get_attributes_for_oid(x509.NameOID.COMMON_NAME)
+        return cn[0].value if cn else "Nome não encontrado"
+    
+    def _try_load_pem_files(self) -> Optional[_LoadedCertificate]:
         """Tenta carregar certificado de arquivos PEM separados."""
         try:
             cert_dir = self.cert_path.parent
@@ -69,19 +170,19 @@ class CertificateManager:
             key_file = cert_dir / "key.pem"
             
             if not (cert_file.exists() and key_file.exists()):
-                return False
+                return None
             
             # Carrega certificado PEM
             with open(cert_file, 'rb') as f:
                 cert_data = f.read()
-                self._certificate = x509.load_pem_x509_certificate(cert_data, default_backend())
+                certificate = x509.load_pem_x509_certificate(cert_data, default_backend())
             
             # Carrega chave privada PEM (tenta sem senha primeiro, depois com senha se necessário)
             with open(key_file, 'rb') as f:
                 key_data = f.read()
                 try:
                     # Primeiro tenta sem senha (chaves PEM do Railway não têm senha)
-                    self._private_key = serialization.load_pem_private_key(
+                    private_key = serialization.load_pem_private_key(
                         key_data, 
                         password=None,
                         backend=default_backend()
@@ -89,20 +190,20 @@ class CertificateManager:
                 except TypeError:
                     # Se falhar, tenta com senha do certificado PFX
                     password_bytes = self.password.encode() if self.password else None
-                    self._private_key = serialization.load_pem_private_key(
+                    private_key = serialization.load_pem_private_key(
                         key_data, 
                         password=password_bytes,
                         backend=default_backend()
                     )
             
-            app_logger.info(f"✅ Certificado PEM carregado: {self.get_subject_name()}")
-            return True
+            app_logger.info(f"✅ Certificado PEM carregado: {self._common_name(certificate)}")
+            return _LoadedCertificate(certificate, private_key)
             
         except Exception as e:
             app_logger.warning(f"Não foi possível carregar certificados PEM: {e}")
-            return False
+            return None
     
-    def _try_load_pfx_file(self) -> bool:
+    def _try_load_pfx_file(self) -> Optional[_LoadedCertificate]:
         """Tenta carregar certificado de arquivo PFX/P12."""
         try:
             with open(self.cert_path, 'rb') as f:
@@ -115,15 +216,12 @@ class CertificateManager:
                 backend=default_backend()
             )
             
-            self._certificate = certificate
-            self._private_key = private_key
-            
-            app_logger.info(f"✅ Certificado PFX carregado: {self.get_subject_name()}")
-            return True
+            app_logger.info(f"✅ Certificado PFX carregado: {self._common_name(certificate)}")
+            return _LoadedCertificate(certificate, private_key)
             
         except Exception as e:
             app_logger.error(f"❌ Erro ao carregar certificado PFX: {e}")
-            return False
+            return None
     
     def is_valid(self) -> bool:
         """
@@ -132,16 +230,20 @@ class CertificateManager:
         Returns:
             True se válido, False caso contrário
         """
-        if not self._certificate:
+        loaded = self._current()
+        if not loaded.certificate:
             return False
         
-        now = datetime.now(timezone.utc)
-        not_before = self._certificate.not_valid_before.replace(tzinfo=timezone.utc)
-        not_after = self._certificate.not_valid_after.replace(tzinfo=timezone.utc)
-        
-        is_valid = not_before <= now <= not_after
+        return self._within_validity(loaded)
+    
+    @staticmethod
+    def _within_validity(loaded: _LoadedCertificate) -> bool:
+        """Compara o horário atual com a validade em cache (sem stat nem datetime)."""
+        is_valid = loaded.not_before_ts <= time.time() <= loaded.not_after_ts
         
         if not is_valid:
+            not_before = loaded.certificate.not_valid_before.replace(tzinfo=timezone.utc)
+            not_after = loaded.certificate.not_valid_after.replace(tzinfo=timezone.utc)
             app_logger.warning(
                 f"Certificado fora da validade. Válido de {not_before} até {not_after}"
             )
@@ -155,13 +257,11 @@ class CertificateManager:
         Returns:
             Nome do titular
         """
-        if not self._certificate:
+        loaded = self._current()
+        if not loaded.certificate:
             return "Certificado não carregado"
         
-        subject = self._certificate.subject
-        cn = subject.get_attributes_for_oid(x509.NameOID.COMMON_NAME)
-        
-        return cn[0].value if cn else "Nome não encontrado"
+        return self._common_name(loaded.certificate)
     
     def get_expiration_date(self) -> Optional[datetime]:
         """
@@ -170,10 +270,11 @@ class CertificateManager:
         Returns:
             Data de expiração ou None
         """
-        if not self._certificate:
+        loaded = self._current()
+        if not loaded.certificate:
             return None
         
-        return self._certificate.not_valid_after
+        return loaded.certificate.not_valid_after
     
     def get_certificate_info(self) -> dict:
         """
@@ -182,7 +283,9 @@ class CertificateManager:
         Returns:
             Dicionário com informações do certificado
         """
-        if not self._certificate:
+        loaded = self._current()
+        certificate = loaded.certificate
+        if not certificate:
             return {
                 "status": "Certificado não carregado",
                 "subject_cnpj": "N/A",
@@ -192,11 +295,11 @@ class CertificateManager:
                 "is_valid": False
             }
         
-        subject = self._certificate.subject
-        issuer = self._certificate.issuer
+        subject = certificate.subject
+        issuer = certificate.issuer
         
         # Extrai CNPJ do subject (se existir)
-        subject_cn = self.get_subject_name()
+        subject_cn = self._common_name(certificate)
         cnpj = "N/A"
         
         # Tenta extrair CNPJ do CN ou de outros atributos
@@ -205,7 +308,7 @@ class CertificateManager:
         if cnpj_match:
             cnpj = cnpj_match.group()
         
-        not_after = self._certificate.not_valid_after.replace(tzinfo=timezone.utc)
+        not_after = certificate.not_valid_after.replace(tzinfo=timezone.utc)
         days_until_exp = (not_after - datetime.now(timezone.utc)).days
         
         return {
@@ -214,11 +317,11 @@ class CertificateManager:
             "subject_cnpj": cnpj,
             "issuer": issuer.get_attributes_for_oid(x509.NameOID.COMMON_NAME)[0].value if issuer.get_attributes_for_oid(x509.NameOID.COMMON_NAME) else "N/A",
             "issuer_cn": issuer.get_attributes_for_oid(x509.NameOID.COMMON_NAME)[0].value if issuer.get_attributes_for_oid(x509.NameOID.COMMON_NAME) else "N/A",
-            "serial_number": str(self._certificate.serial_number),
-            "valid_from": self._certificate.not_valid_before.replace(tzinfo=timezone.utc).isoformat(),
+            "serial_number": str(certificate.serial_number),
+            "valid_from": certificate.not_valid_before.replace(tzinfo=timezone.utc).isoformat(),
             "valid_until": not_after.isoformat(),
             "not_after": not_after.strftime("%d/%m/%Y %H:%M:%S"),
-            "is_valid": self.is_valid(),
+            "is_valid": self._within_validity(loaded),
             "days_until_expiration": days_until_exp
         }
     
@@ -232,16 +335,17 @@ class CertificateManager:
         Returns:
             Assinatura digital
         """
-        if not self._private_key:
+        loaded = self._current()
+        if not loaded.private_key:
             raise ValueError("Chave privada não carregada")
         
-        if not self.is_valid():
+        if not loaded.certificate or not self._within_validity(loaded):
             raise ValueError("Certificado fora da validade")
         
         from cryptography.hazmat.primitives import hashes
         from cryptography.hazmat.primitives.asymmetric import padding
         
-        signature = self._private_key.sign(
+        signature = loaded.private_key.sign(
             data,
             padding.PKCS1v15(),
             hashes.SHA256()
@@ -249,6 +353,36 @@ class CertificateManager:
         
         return signature
     
+    @staticmethod
+    def _cert_pem_of(loaded: _LoadedCertificate) -> str:
+        """Serializa (uma vez por carregamento) o certificado em PEM."""
+        if not loaded.certificate:
+            raise ValueError("Certificado não carregado")
+        
+        if loaded.cert_pem is None:
+            pem_data = loaded.certificate.public_bytes(
+                encoding=serialization.Encoding.PEM
+            )
+            loaded.cert_pem = pem_data.decode('utf-8')
+        
+        return loaded.cert_pem
+    
+    @staticmethod
+    def _key_pem_of(loaded: _LoadedCertificate) -> str:
+        """Serializa (uma vez por carregamento) a chave privada em PEM."""
+        if not loaded.private_key:
+            raise ValueError("Chave privada não carregada")
+        
+        if loaded.key_pem is None:
+            pem_data = loaded.private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.TraditionalOpenSSL,
+                encryption_algorithm=serialization.NoEncryption()
+            )
+            loaded.key_pem = pem_data.decode('utf-8')
+        
+        return loaded.key_pem
+    
     def get_certificate_pem(self) -> str:
         """
         Retorna o certificado em formato PEM.
@@ -256,14 +390,7 @@ class CertificateManager:
         Returns:
             Certificado em formato PEM (string)
         """
-        if not self._certificate:
-            raise ValueError("Certificado não carregado")
-        
-        pem_data = self._certificate.public_bytes(
-            encoding=serialization.Encoding.PEM
-        )
-        
-        return pem_data.decode('utf-8')
+        return self._cert_pem_of(self._current())
     
     def get_private_key_pem(self) -> str:
         """
@@ -272,60 +399,91 @@ class CertificateManager:
         Returns:
             Chave privada em formato PEM (string)
         """
-        if not self._private_key:
-            raise ValueError("Chave privada não carregada")
-        
-        pem_data = self._private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.TraditionalOpenSSL,
-            encryption_algorithm=serialization.NoEncryption()
-        )
-        
-        return pem_data.decode('utf-8')
+        return self._key_pem_of(self._current())
     
     def get_cert_and_key_files(self) -> Tuple[str, str]:
         """
         Cria arquivos temporários com certificado e chave em formato PEM.
         
+        Os arquivos são criados uma única vez por certificado carregado e
+        reutilizados enquanto o processo viver (removidos na saída do processo).
+        
         Returns:
             Tupla com caminhos (cert_file, key_file)
         """
-        import tempfile
+        loaded = self._current()
+        if loaded.pem_files is not None:
+            return loaded.pem_files
         
-        # Cria arquivos temporários
-        cert_fd, cert_path = tempfile.mkstemp(suffix='.pem', text=True)
-        key_fd, key_path = tempfile.mkstemp(suffix='.pem', text=True)
+        import atexit
         
-        try:
-            # Escreve certificado
-            with open(cert_path, 'w') as f:
-                f.write(self.get_certificate_pem())
+        with self._lock:
+            # Outra thread pode ter criado os arquivos enquanto esperávamos
+            if loaded.pem_files is not None:
+                return loaded.pem_files
+            
+            # Serializa antes de criar os arquivos (falha sem deixar temporários)
+            cert_pem = self._cert_pem_of(loaded)
+            key_pem = self._key_pem_of(loaded)
             
-            # Escreve chave privada
-            with open(key_path, 'w') as f:
-                f.write(self.get_private_key_pem())
+            cert_path = self._write_temp_pem(cert_pem)
+            try:
+                key_path = self._write_temp_pem(key_pem)
+            except Exception:
+                os.unlink(cert_path)
+                raise
             
-            return cert_path, key_path
+            for path in (cert_path, key_path):
+                atexit.register(Path(path).unlink, missing_ok=True)
+            
+            loaded.pem_files = (cert_path, key_path)
+            return loaded.pem_files
+    
+    @staticmethod
+    def _write_temp_pem(pem: str) -> str:
+        """
+        Grava um PEM em arquivo temporário usando o fd retornado pelo mkstemp.
+        
+        Args:
+            pem: Conteúdo PEM
             
-        finally:
-            # Fecha os file descriptors
-            import os
-            os.close(cert_fd)
-            os.close(key_fd)
+        Returns:
+            Caminho do arquivo criado (removido se a escrita falhar)
+        """
+        import tempfile
+        
+        fd, path = tempfile.mkstemp(suffix='.pem')
+        try:
+            # fdopen assume o fd (fecha ao sair) e write() grava o buffer inteiro
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pem.encode('utf-8'))
+        except Exception:
+            os.unlink(path)
+            raise
+        
+        return path
 
 
 # Instância global (singleton) com lazy initialization
-_certificate_manager_instance = None
-
+@lru_cache(maxsize=None)
 def get_certificate_manager() -> CertificateManager:
     """
     Obtém a instância singleton do CertificateManager.
     Usa lazy initialization para evitar carregar antes do railway_init.py.
     """
-    global _certificate_manager_instance
-    if _certificate_manager_instance is None:
-        _certificate_manager_instance = CertificateManager()
-    return _certificate_manager_instance
+    return CertificateManager()
+
+
+class _LazyCertificateManager:
+    """Proxy que só cria o CertificateManager no primeiro acesso a um atributo."""
+    
+    def __getattr__(self, name):
+        return getattr(get_certificate_manager(), name)
+    
+    def __call__(self) -> CertificateManager:
+        # Compatibilidade com código legado que chama certificate_manager()
+        return get_certificate_manager()
+
 
-# Alias para compatibilidade com código legado (será chamado como função)
-certificate_manager = get_certificate_manager
+# Alias para compatibilidade com código legado (certificate_manager.x ou certificate_manager())
+certificate_manager = _LazyCertificateManager()